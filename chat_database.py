@@ -203,6 +203,102 @@ class ChatDatabase:
             finally:
                 cursor.close()
     
+    def upsert_error_message(self, session_id: str, user_id: str, message: MessageResponse, user_info: dict = None) -> bool:
+        """
+        Update an error message in place, or insert it as a new message.
+        
+        Runs as a single transaction: if message.message_id already exists in the
+        session it is updated, otherwise the session is created if missing and the
+        message is inserted under that same id.
+        
+        Returns:
+            bool: True if a new message was inserted, False if an existing one was updated
+        
+        Raises:
+            HTTPException: 404 if the session exists but belongs to another user
+        """
+        with self.db_lock:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            
+            try:
+                conn.execute('BEGIN TRANSACTION')
+                
+                sources = json.dumps(message.sources) if message.sources else None
+                metrics = json.dumps(message.metrics) if message.metrics else None
+                
+                cursor.execute('''
+                UPDATE messages 
+                SET content = ?, 
+                    role = ?, 
+                    model = ?, 
+                    timestamp = ?, 
+                    sources = ?, 
+                    metrics = ?
+                WHERE message_id = ? AND session_id = ? AND user_id = ?
+                ''', (
+                    message.content,
+                    message.role,
+                    message.model,
+                    message.timestamp.isoformat(),
+                    sources,
+                    metrics,
+                    message.message_id,
+                    session_id,
+                    user_id
+                ))
+                is_new = cursor.rowcount == 0
+                
+                if is_new:
+                    cursor.execute('SELECT user_id FROM sessions WHERE session_id = ?', (session_id,))
+                    session_row = cursor.fetchone()
+                    if session_row and session_row['user_id'] != user_id:
+                        logger.error(f"Session {session_id} does not belong to user {user_id}")
+                        conn.rollback()
+                        raise HTTPException(status_code=404, detail="Chat not found")
+                    
+                    if not session_row:
+                        # The first message of a session may have failed before it was saved
+                        cursor.execute('''
+                        INSERT INTO sessions (session_id, user_id, user_email, first_query, timestamp, is_active)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                        ''', (
+                            session_id,
+                            user_id,
+                            user_info.get('email') if user_info else None,
+                            message.content,
+                            message.timestamp.isoformat(),
+                            1
+                        ))
+                    
+                    cursor.execute('''
+                    INSERT INTO messages (
+                        message_id, session_id, user_id, content, role, model, 
+                        timestamp, sources, metrics
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ''', (
+                        message.message_id,
+                        session_id,
+                        user_id,
+                        message.content,
+                        message.role,
+                        message.model,
+                        message.timestamp.isoformat(),
+                        sources,
+                        metrics
+                    ))
+                    
+                    self.first_message_cache[session_id] = False
+                
+                conn.commit()
+                return is_new
+            except sqlite3.Error as e:
+                conn.rollback()
+                logger.error(f"Error upserting error message: {str(e)}")
+                raise
+            finally:
+                cursor.close()
+    
     def get_chat_history(self, user_id: str = None) -> ChatHistoryResponse:
         """Retrieve chat sessions with their messages for a specific user"""
         with self.db_lock:
@@ -4,7 +4,6 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.responses import StreamingResponse, RedirectResponse
 from typing import Dict, List, Optional
 from databricks.sdk import WorkspaceClient
-import os
 from dotenv import load_dotenv
 import uuid
 from datetime import datetime, timedelta
@@ -18,7 +17,7 @@ from token_minter import TokenMinter
 from collections import defaultdict
 from contextlib import asynccontextmanager
 from models import MessageRequest, MessageResponse, ChatHistoryItem, ChatHistoryResponse, CreateChatRequest, ErrorRequest, RegenerateRequest
-from utils.config import URL, SERVING_ENDPOINT_NAME, DATABRICKS_HOST, CLIENT_ID, CLIENT_SECRET, GENIE_MCP_ENABLED
+from utils.config import URL, LOGIN_URL, settings
 from utils import *
 from utils.logging_handler import with_logging
 from utils.app_state import app_state
@@ -63,13 +62,13 @@ app.add_middleware(
 
 # Initialize token minter
 token_minter = TokenMinter(
-    client_id=CLIENT_ID,
-    client_secret=CLIENT_SECRET,
-    host=DATABRICKS_HOST
+    client_id=settings.client_id,
+    client_secret=settings.client_secret,
+    host=settings.databricks_host
 )
 
 # Initialize Genie MCP client
-genie_client = GenieMCPClient(token_minter) if GENIE_MCP_ENABLED else None
+genie_client = GenieMCPClient(token_minter) if settings.genie_mcp_enabled else None
 
 # Dependency to get auth headers
 async def get_auth_headers() -> dict:
@@ -92,7 +91,7 @@ async def error(
 
 @api_app.get("/model")
 async def get_model():
-    return {"model": SERVING_ENDPOINT_NAME}
+    return {"model": settings.serving_endpoint_name}
 
 # Modify the chat endpoint to handle sessions
 @api_app.post("/chat")
@@ -128,7 +127,7 @@ async def chat(
             try:
                 # Check if query should be routed to Genie Space for data queries
                 should_use_genie = (
-                    GENIE_MCP_ENABLED and 
+                    settings.genie_mcp_enabled and 
                     genie_client is not None and 
                     query_router.should_route_to_genie(message.content)
                 )
@@ -182,7 +181,7 @@ async def chat(
                     write=8.0,
                     pool=8.0
                 )
-                supports_streaming, supports_trace = await check_endpoint_capabilities(SERVING_ENDPOINT_NAME, streaming_support_cache)
+                supports_streaming, supports_trace = await check_endpoint_capabilities(settings.serving_endpoint_name, streaming_support_cache)
                 
                 request_data = {
                     "messages": [
@@ -232,8 +231,8 @@ async def chat(
                                         raise Exception("Streaming not supported")
                             except (httpx.ReadTimeout, httpx.HTTPError, Exception) as e:
                                 logger.error(f"Streaming failed with error: {str(e)}, falling back to non-streaming")
-                                if SERVING_ENDPOINT_NAME in streaming_support_cache['endpoints']:
-                                    streaming_support_cache['endpoints'][SERVING_ENDPOINT_NAME].update({
+                                if settings.serving_endpoint_name in streaming_support_cache['endpoints']:
+                                    streaming_support_cache['endpoints'][settings.serving_endpoint_name].update({
                                         'supports_streaming': False,
                                         'last_checked': datetime.now()
                                     })
@@ -363,7 +362,7 @@ async def regenerate_message(
         async def generate():
             timeout = httpx.Timeout(connect=5.0, read=30.0, write=5.0, pool=5.0)
             async with httpx.AsyncClient(timeout=timeout) as client:
-                supports_streaming, supports_trace = await check_endpoint_capabilities(SERVING_ENDPOINT_NAME, streaming_support_cache)
+                supports_streaming, supports_trace = await check_endpoint_capabilities(settings.serving_endpoint_name, streaming_support_cache)
                 request_data = {
                 "messages": [
                     *([{"role": msg["role"], "content": msg["content"]} for msg in history_up_to_message[:-1]] 
@@ -455,7 +454,7 @@ async def rate_message(
 # Add logout endpoint
 @api_app.get("/logout")
 async def logout():
-    return RedirectResponse(url=f"https://{os.getenv('DATABRICKS_HOST')}/login.html", status_code=303)
+    return RedirectResponse(url=LOGIN_URL, status_code=303)
 
 @api_app.get("/login")
 async def login(user_info: dict = Depends(get_user_info)):
@@ -56,3 +56,15 @@ class TokenMinter:
                 self._refresh_token()
             return self.token
 
+    def get_token_ttl(self) -> float:
+        """
+        Get how long the current token can be used before it is refreshed.
+        
+        Returns:
+            float: Seconds until get_token() would refresh the token
+        """
+        with self.lock:
+            if not self.token or not self.expiry_time:
+                return 0.0
+            remaining = self.expiry_time - timedelta(minutes=5) - datetime.now()
+            return max(remaining.total_seconds(), 0.0)
@@ -6,7 +6,8 @@ from .message_handler import MessageHandler
 from .error_handler import ErrorHandler
 from .streaming_handler import StreamingHandler
 from .request_handler import RequestHandler
-from .config import SERVING_ENDPOINT_NAME
+from .config import settings
+from .http_clients import close_genie_client
 import asyncio
 from datetime import datetime
 
@@ -32,7 +33,7 @@ class AppState:
         self.message_handler = MessageHandler(self.chat_db, self.chat_history_cache)
         self.error_handler = ErrorHandler(self.message_handler)
         self.streaming_handler = StreamingHandler()
-        self.request_handler = RequestHandler(SERVING_ENDPOINT_NAME)
+        self.request_handler = RequestHandler(settings.serving_endpoint_name)
         self.streaming_semaphore = self.request_handler.streaming_semaphore
         self.request_queue = self.request_handler.request_queue
         
@@ -43,7 +44,7 @@ class AppState:
 
     async def shutdown(self, app: FastAPI):
         """Shutdown tasks"""
-        pass
+        await close_genie_client()
 
 # Create a global app state instance
 app_state = AppState() 
\ No newline at end of file
@@ -1,21 +1,35 @@
 import os
+from dataclasses import dataclass, field
+from typing import Optional
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv(override=True)
 
-# Constants
-SERVING_ENDPOINT_NAME = os.getenv("SERVING_ENDPOINT_NAME")
-assert SERVING_ENDPOINT_NAME, "SERVING_ENDPOINT_NAME is not set"
 
-DATABRICKS_HOST = os.environ.get("DATABRICKS_HOST")
-CLIENT_ID = os.environ.get("DATABRICKS_CLIENT_ID")
-CLIENT_SECRET = os.environ.get("DATABRICKS_CLIENT_SECRET")
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """Environment-derived settings, read once at import"""
+    serving_endpoint_name: str
+    databricks_host: Optional[str]
+    client_id: Optional[str]
+    client_secret: Optional[str] = field(repr=False)
+    # Genie Space Configuration
+    genie_space_id: str
+    genie_space_name: str
+    genie_mcp_enabled: bool
 
-# Genie Space Configuration
-GENIE_SPACE_ID = os.environ.get("GENIE_SPACE_ID", "01f0eaaeedaf11b7b236db1eb5bbd243")
-GENIE_SPACE_NAME = os.environ.get("GENIE_SPACE_NAME", "genie-client-background")
-GENIE_MCP_ENABLED = os.environ.get("GENIE_MCP_ENABLED", "true").lower() == "true"
+
+settings = Settings(
+    serving_endpoint_name=os.getenv("SERVING_ENDPOINT_NAME"),
+    databricks_host=os.environ.get("DATABRICKS_HOST"),
+    client_id=os.environ.get("DATABRICKS_CLIENT_ID"),
+    client_secret=os.environ.get("DATABRICKS_CLIENT_SECRET"),
+    genie_space_id=os.environ.get("GENIE_SPACE_ID", "01f0eaaeedaf11b7b236db1eb5bbd243"),
+    genie_space_name=os.environ.get("GENIE_SPACE_NAME", "genie-client-background"),
+    genie_mcp_enabled=os.environ.get("GENIE_MCP_ENABLED", "true").lower() == "true"
+)
+assert settings.serving_endpoint_name, "SERVING_ENDPOINT_NAME is not set"
 
 # API Configuration
 API_TIMEOUT = 30.0
@@ -34,4 +48,16 @@ ERROR_MESSAGES = {
     "not_found": "{resource_id} not found. Please ensure you're using a valid session ID.",
     "general": "An error occurred while processing your request."
 } 
-URL = f"https://{DATABRICKS_HOST}/serving-endpoints/{SERVING_ENDPOINT_NAME}/invocations"
+
+# Endpoint URLs (host is fixed for the process, so the templates are built once)
+_ENDPOINT_TPL = f"https://{settings.databricks_host}/serving-endpoints/{{name}}/invocations"
+LOGIN_URL = f"https://{settings.databricks_host}/login.html"
+
+
+def get_serving_endpoint_url(endpoint_name: str) -> str:
+    """Get the invocations URL for a serving endpoint"""
+    return _ENDPOINT_TPL.format(name=endpoint_name)
+
+
+URL = get_serving_endpoint_url(settings.serving_endpoint_name)
+
@@ -1,16 +1,28 @@
 from fastapi import HTTPException, Depends
 import logging
-from typing import Dict, Any
-from .config import ERROR_MESSAGES, SERVING_ENDPOINT_NAME
+from typing import Dict, Any, Set
+from .config import ERROR_MESSAGES, settings
 from models import ErrorRequest, MessageResponse
 from .message_handler import MessageHandler
-import uuid
+import asyncio
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
+_not_found_tpl = ERROR_MESSAGES["not_found"]
+
+
+@lru_cache(maxsize=512)
+def _fmt_not_found(resource_id: str) -> str:
+    """Format the not-found message, cached per resource (bounded to cap memory)"""
+    return _not_found_tpl.format(resource_id=resource_id)
+
+
 class ErrorHandler:
     def __init__(self, message_handler: MessageHandler):
         self.message_handler = message_handler
+        # Strong references keep pending persistence tasks from being garbage collected
+        self._background_tasks: Set[asyncio.Task] = set()
 
     @staticmethod
     def handle_error(status_code: int = 500, detail: str = None) -> None:
@@ -41,9 +53,7 @@ class ErrorHandler:
         """Handle not found errors"""
         raise HTTPException(
             status_code=404,
-            detail=ERROR_MESSAGES["not_found"].format(
-                resource_id=resource_id
-            )
+            detail=_fmt_not_found(resource_id)
         )
 
     async def handle_error_endpoint(
@@ -56,81 +66,56 @@ class ErrorHandler:
         
         This endpoint should be robust and never fail, as it's used to report
         errors from the chat endpoint. If this fails, the frontend will show
-        a secondary error which masks the real issue.
+        a secondary error which masks the real issue. Persistence therefore
+        runs in a background task and the response is returned immediately.
         """
+        task = asyncio.create_task(self._persist_error(error, user_info))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return {"status": "error saved", "message_id": error.message_id}
+
+    async def _persist_error(self, error: ErrorRequest, user_info: dict) -> None:
+        """Save or update the reported error message in the database and cache."""
         try:
             user_id = user_info["user_id"]
-        
-            # Get the chat session from database
-            chat_data = self.message_handler.chat_db.get_chat(error.session_id, user_id)
-            
-            # If session doesn't exist, create a new error message anyway
-            # This can happen if the first message failed before being saved
-            if not chat_data:
-                logger.warning(f"Session {error.session_id} not found in database. Creating error message without session.")
-                # Create error message with a new ID
-                error_message = MessageResponse(
-                    message_id=str(uuid.uuid4()),
-                    content=error.content,
-                    role=error.role,
-                    model=SERVING_ENDPOINT_NAME,
-                    timestamp=error.timestamp,
-                    sources=error.sources,
-                    metrics=error.metrics
-                )
-                # Try to save to database (this will create the session)
-                try:
-                    self.message_handler.chat_db.save_message_to_session(
-                        error.session_id, user_id, error_message, user_info, is_first_message=True
-                    )
-                except Exception as save_error:
-                    logger.error(f"Failed to save error message to new session: {str(save_error)}")
-                    # Still return success to prevent frontend from showing secondary error
-                return {"status": "error saved", "message_id": error_message.message_id}
             
-            # Check if this is a new error message or updating an existing one
-            is_new_error = not any(msg.message_id == error.message_id for msg in chat_data.messages)
+            error_message = MessageResponse(
+                message_id=error.message_id,
+                content=error.content,
+                role=error.role,
+                model=settings.serving_endpoint_name,
+                timestamp=error.timestamp,
+                sources=error.sources,
+                metrics=error.metrics
+            )
             
-            if is_new_error:
-                # Create new error message
-                error_message = MessageResponse(
-                    message_id=str(uuid.uuid4()),  # Generate new ID for new error
-                    content=error.content,
-                    role=error.role,
-                    model=SERVING_ENDPOINT_NAME,
-                    timestamp=error.timestamp,
-                    sources=error.sources,
-                    metrics=error.metrics
-                )
-                # Save new error message to database
-                self.message_handler.chat_db.save_message_to_session(error.session_id, user_id, error_message)
-                # Add to cache
-                self.message_handler.chat_history_cache.add_message(error.session_id, {
-                    "role": error.role,
-                    "content": error.content,
-                    "message_id": error_message.message_id,
-                    "timestamp": error.timestamp
-                })
-            else:
-                # Update existing message
-                error_message = MessageResponse(
-                    message_id=error.message_id,  # Use existing message ID
-                    content=error.content,
-                    role=error.role,
-                    model=SERVING_ENDPOINT_NAME,
-                    timestamp=error.timestamp,
-                    sources=error.sources,
-                    metrics=error.metrics
+            # Update the existing message, or save it as a new one (creating the
+            # session if the first message failed before being saved), in one transaction.
+            # Either way the row keeps error.message_id, the id returned to the client
+            try:
+                # Run the blocking sqlite write off the event loop; ChatDatabase
+                # keeps one connection per thread
+                is_new_error = await asyncio.to_thread(
+                    self.message_handler.chat_db.upsert_error_message,
+                    error.session_id, user_id, error_message, user_info
                 )
-                # Update message in database
-                self.message_handler.chat_db.update_message(error.session_id, user_id, error_message)
-                # Update in cache
-                self.message_handler.chat_history_cache.update_message(error.session_id, error.message_id, error_message)
+            except HTTPException:
+                # The session belongs to another user; the cache is keyed by session
+                # only, so it must not be touched either
+                logger.warning(f"Ignoring error report for session {error.session_id} not owned by user {user_id}")
+                return
             
-            return {"status": "error saved", "message_id": error_message.message_id}
+            # The upsert has confirmed the session belongs to user_id
+            try:
+                if is_new_error:
+                    self.message_handler.chat_history_cache.add_message(error.session_id, error_message)
+                else:
+                    self.message_handler.chat_history_cache.update_message(error.session_id, error.message_id, error_message)
+            except Exception as cache_error:
+                # The database is the source of truth; a stale cache is refreshed on the next load
+                logger.warning(f"Failed to update cache for error message: {str(cache_error)}")
             
         except Exception as e:
-            # Catch-all handler to ensure this endpoint never fails
-            # Log the error but return success to prevent masking the primary error
-            logger.error(f"Unexpected error in handle_error_endpoint: {str(e)}")
-            return {"status": "error logged", "message_id": error.message_id or "unknown"}
+            # Catch-all handler; the endpoint has already reported success so
+            # the primary error isn't masked by a secondary one
+            logger.error(f"Unexpected error persisting reported error: {str(e)}")
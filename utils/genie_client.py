@@ -1,31 +1,75 @@
 import httpx
 import asyncio
 import logging
-import json
+import orjson
+import random
+import time
 import uuid
-from typing import Dict, Any, Optional, Tuple, Union
-import pandas as pd
-from token_minter import TokenMinter
-from utils.config import DATABRICKS_HOST, CLIENT_ID, CLIENT_SECRET, GENIE_SPACE_ID
+from typing import TYPE_CHECKING, Dict, Any, Optional, Tuple, Union
+from cachetools import TTLCache
+from utils.config import settings, CACHE_UPDATE_INTERVAL, MAX_CONCURRENT_STREAMS
+from utils.http_clients import get_genie_client
+
+if TYPE_CHECKING:
+    from token_minter import TokenMinter
 
 logger = logging.getLogger(__name__)
 
-GENIE_MCP_BASE_URL = f"https://{DATABRICKS_HOST}/api/2.0/mcp/genie/{GENIE_SPACE_ID}"
+GENIE_MCP_BASE_URL = f"https://{settings.databricks_host}/api/2.0/mcp/genie/{settings.genie_space_id}"
+
+
+def _to_json(data: Any) -> str:
+    """Pretty-print data as JSON for display."""
+    return orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2).decode()
+
+
+def _markdown_cell(value: Any) -> str:
+    """Render a value as a single-line markdown table cell."""
+    return str(value).replace("|", "\\|").replace("\n", " ")
 
 
 class GenieMCPClient:
     """Client for interacting with Genie Space via MCP server."""
     
-    def __init__(self, token_minter: TokenMinter):
+    def __init__(self, token_minter: "TokenMinter", client: Optional[httpx.AsyncClient] = None):
         self.token_minter = token_minter
-        self.client = httpx.AsyncClient(timeout=120)
-        self.conversation_ids: Dict[str, str] = {}
+        # An injected client is owned by this instance; otherwise the shared
+        # app-wide pool is looked up per request so it survives app restarts
+        self._own_client = client
+        # Bounded so sessions that never clear their conversation don't leak
+        self.conversation_ids: TTLCache = TTLCache(maxsize=10_000, ttl=CACHE_UPDATE_INTERVAL)
+        self._cached_headers: Optional[Dict[str, str]] = None
+        self._headers_expiry = 0.0
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._poll_sem = asyncio.Semaphore(MAX_CONCURRENT_STREAMS)
+        self._query_tool = f"query_space_{settings.genie_space_id}"
+        self._poll_tool = f"poll_response_{settings.genie_space_id}"
     
     def _get_headers(self) -> Dict[str, str]:
-        """Get headers with fresh token."""
+        """Get headers with a valid token, rebuilt only when the token is due for refresh."""
+        now = time.monotonic()
+        if self._cached_headers is None or now >= self._headers_expiry - 30:
+            token = self.token_minter.get_token()
+            self._headers_expiry = now + self.token_minter.get_token_ttl()
+            self._cached_headers = {
+                "Authorization": f"Bearer {token}",
+                "Content-Type": "application/json"
+            }
+        return self._cached_headers
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The HTTP client for Genie requests."""
+        return self._own_client or get_genie_client()
+    
+    @staticmethod
+    def _tool_call_payload(tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the JSON-RPC envelope for an MCP tools/call request."""
         return {
-            "Authorization": f"Bearer {self.token_minter.get_token()}",
-            "Content-Type": "application/json"
+            "jsonrpc": "2.0",
+            "id": str(uuid.uuid4()),
+            "method": "tools/call",
+            "params": {"name": tool_name, "arguments": arguments}
         }
     
     async def query_genie(
@@ -45,37 +89,49 @@ class GenieMCPClient:
         Returns:
             Tuple of (response_text, conversation_id, error_message)
         """
+        # A duplicate submission (e.g. a double-click) awaits the query that
+        # is already in flight instead of starting its own request and poll loop
+        inflight_key = (session_id, query)
+        inflight = self._inflight.get(inflight_key)
+        if inflight is None:
+            inflight = asyncio.create_task(
+                self._query_genie(query, session_id, conversation_id)
+            )
+            self._inflight[inflight_key] = inflight
+            inflight.add_done_callback(lambda _: self._inflight.pop(inflight_key, None))
+        
+        # Shielded so one caller going away doesn't cancel the shared query
+        return await asyncio.shield(inflight)
+    
+    async def _query_genie(
+        self, 
+        query: str, 
+        session_id: str,
+        conversation_id: Optional[str] = None
+    ) -> Tuple[str, Optional[str], Optional[str]]:
+        """Send a single query to the Genie Space MCP server."""
         try:
             headers = self._get_headers()
             
-            tool_name = f"query_space_{GENIE_SPACE_ID}"
             arguments = {"query": query}
             if conversation_id:
                 arguments["conversation_id"] = conversation_id
             
-            payload = {
-                "jsonrpc": "2.0",
-                "id": str(uuid.uuid4()),
-                "method": "tools/call",
-                "params": {
-                    "name": tool_name,
-                    "arguments": arguments
-                }
-            }
+            payload = self._tool_call_payload(self._query_tool, arguments)
             
             logger.info(f"Querying Genie Space with: {query[:50]}...")
             
             response = await self.client.post(
                 GENIE_MCP_BASE_URL,
                 headers=headers,
-                json=payload
+                content=orjson.dumps(payload)
             )
             
             if response.status_code == 429:
                 return "", None, "The service is currently experiencing high demand. Please try again in a few moments."
             
             response.raise_for_status()
-            result = response.json()
+            result = orjson.loads(response.content)
             
             if "error" in result:
                 error_msg = result.get("error", {}).get("message", "Unknown error from Genie")
@@ -87,7 +143,7 @@ class GenieMCPClient:
                 text_content = content[0].get("text", "")
                 
                 try:
-                    parsed = json.loads(text_content)
+                    parsed = orjson.loads(text_content)
                     new_conversation_id = parsed.get("conversationId")
                     message_id = parsed.get("messageId")
                     status = parsed.get("status", "")
@@ -104,11 +160,13 @@ class GenieMCPClient:
                             return "", new_conversation_id, error
                         return response_text, new_conversation_id, None
                     
-                    content_data = parsed.get("content", text_content)
+                    # Fall back to the already parsed payload rather than re-parsing the text
+                    content_data = parsed.get("content", parsed)
                     return self._format_genie_content(content_data), new_conversation_id, None
                     
-                except json.JSONDecodeError:
-                    return self._format_response(text_content), conversation_id, None
+                except orjson.JSONDecodeError:
+                    # Not JSON, so it's a plain-text answer
+                    return text_content, conversation_id, None
             
             return "No response from Genie Space.", conversation_id, None
             
@@ -121,84 +179,104 @@ class GenieMCPClient:
             logger.error(f"Error querying Genie: {e}")
             return "", conversation_id, f"Error querying Genie Space: {str(e)}"
     
+    @staticmethod
+    def _retry_after_seconds(response: httpx.Response, default: float) -> float:
+        """Read the Retry-After header (in seconds), falling back to a default."""
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return max(float(retry_after), 0.0)
+            except ValueError:
+                pass
+        return default
+    
     async def _poll_for_completion(
         self, 
         conversation_id: str, 
         message_id: str,
-        max_attempts: int = 60,
-        poll_interval: float = 2.0
+        timeout: float = 120.0,
+        initial_interval: float = 0.2,
+        max_interval: float = 2.0
     ) -> Tuple[str, Optional[str]]:
         """
         Poll for completion of an async Genie query.
         
+        The delay between polls grows exponentially from initial_interval up
+        to max_interval, with jitter so concurrent sessions don't poll in
+        lockstep. Rate-limited polls wait for the server's Retry-After.
+        
         Args:
             conversation_id: The Genie conversation ID
             message_id: The message ID to poll
-            max_attempts: Maximum polling attempts
-            poll_interval: Seconds between polls
+            timeout: Overall wall-clock polling budget in seconds
+            initial_interval: Seconds before the first re-poll
+            max_interval: Upper bound on seconds between polls
             
         Returns:
             Tuple of (response_text, error_message)
         """
-        tool_name = f"poll_response_{GENIE_SPACE_ID}"
+        arguments = {
+            "conversation_id": conversation_id,
+            "message_id": message_id
+        }
+        attempt = 0
         
-        for attempt in range(max_attempts):
-            try:
-                headers = self._get_headers()
-                
-                payload = {
-                    "jsonrpc": "2.0",
-                    "id": str(uuid.uuid4()),
-                    "method": "tools/call",
-                    "params": {
-                        "name": tool_name,
-                        "arguments": {
-                            "conversation_id": conversation_id,
-                            "message_id": message_id
-                        }
-                    }
-                }
-                
-                response = await self.client.post(
-                    GENIE_MCP_BASE_URL,
-                    headers=headers,
-                    json=payload
-                )
-                
-                if response.status_code == 429:
-                    await asyncio.sleep(poll_interval * 2)
-                    continue
-                
-                response.raise_for_status()
-                result = response.json()
-                
-                if "error" in result:
-                    error_msg = result.get("error", {}).get("message", "Unknown error")
-                    if "expired" in error_msg.lower() or "not found" in error_msg.lower():
-                        return "", "The conversation has expired. Please try your query again."
-                    return "", error_msg
-                
-                content = result.get("result", {}).get("content", [])
-                if content and len(content) > 0:
-                    text_content = content[0].get("text", "")
-                    
+        try:
+            async with asyncio.timeout(timeout):
+                while True:
+                    poll_interval = min(initial_interval * (1.5 ** attempt), max_interval) + random.uniform(0, 0.1)
+                    attempt += 1
                     try:
-                        parsed = json.loads(text_content)
-                        status = parsed.get("status", "")
+                        headers = self._get_headers()
                         
-                        if status.upper() in ["COMPLETED", "COMPLETE"]:
-                            content_data = parsed.get("content", text_content)
-                            return self._format_genie_content(content_data), None
-                        elif status.upper() in ["ERROR", "FAILED"]:
-                            return "", parsed.get("error", "Query failed")
-                    except json.JSONDecodeError:
-                        pass
-                
-                await asyncio.sleep(poll_interval)
-                
-            except Exception as e:
-                logger.warning(f"Poll attempt {attempt + 1} failed: {e}")
-                await asyncio.sleep(poll_interval)
+                        payload = self._tool_call_payload(self._poll_tool, arguments)
+                        
+                        # Bound concurrent polls so long-running queries can't take
+                        # every connection away from fresh queries
+                        async with self._poll_sem:
+                            response = await self.client.post(
+                                GENIE_MCP_BASE_URL,
+                                headers=headers,
+                                content=orjson.dumps(payload)
+                            )
+                        
+                        if response.status_code == 429:
+                            retry_after = self._retry_after_seconds(response, max_interval * 2)
+                            await asyncio.sleep(retry_after)
+                            continue
+                        
+                        response.raise_for_status()
+                        result = orjson.loads(response.content)
+                        
+                        if "error" in result:
+                            error_msg = result.get("error", {}).get("message", "Unknown error")
+                            if "expired" in error_msg.lower() or "not found" in error_msg.lower():
+                                return "", "The conversation has expired. Please try your query again."
+                            return "", error_msg
+                        
+                        content = result.get("result", {}).get("content", [])
+                        if content and len(content) > 0:
+                            text_content = content[0].get("text", "")
+                            
+                            try:
+                                parsed = orjson.loads(text_content)
+                                status = parsed.get("status", "")
+                                
+                                if status.upper() in ["COMPLETED", "COMPLETE"]:
+                                    content_data = parsed.get("content", parsed)
+                                    return self._format_genie_content(content_data), None
+                                elif status.upper() in ["ERROR", "FAILED"]:
+                                    return "", parsed.get("error", "Query failed")
+                            except orjson.JSONDecodeError:
+                                pass
+                        
+                        await asyncio.sleep(poll_interval)
+                        
+                    except Exception as e:
+                        logger.warning(f"Poll attempt {attempt} failed: {e}")
+                        await asyncio.sleep(poll_interval)
+        except TimeoutError:
+            pass
         
         return "", "Query timed out. Please try again."
     
@@ -211,9 +289,9 @@ class GenieMCPClient:
         """
         if isinstance(content, str):
             try:
-                data = json.loads(content)
+                data = orjson.loads(content)
                 return self._format_genie_content(data)
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 return content
         
         if isinstance(content, dict):
@@ -247,42 +325,27 @@ class GenieMCPClient:
             elif query:
                 return f"Query executed: {query}"
             
-            return json.dumps(content, indent=2)
+            return _to_json(content)
         
         return str(content)
     
-    def _format_response(self, response: Any) -> str:
-        """Format the Genie response for display."""
-        if isinstance(response, str):
-            try:
-                data = json.loads(response)
-                if isinstance(data, list):
-                    return self._format_data_as_table(data)
-                elif isinstance(data, dict):
-                    if "data" in data:
-                        return self._format_data_as_table(data["data"])
-                    return json.dumps(data, indent=2)
-                return response
-            except json.JSONDecodeError:
-                return response
-        elif isinstance(response, list):
-            return self._format_data_as_table(response)
-        elif isinstance(response, dict):
-            if "data" in response:
-                return self._format_data_as_table(response["data"])
-            return json.dumps(response, indent=2)
-        return str(response)
-    
     def _format_data_as_table(self, data: list) -> str:
         """Format list data as a markdown table."""
         if not data:
             return "No data found."
         
         try:
-            df = pd.DataFrame(data)
-            return df.to_markdown(index=False)
+            # Union of keys in first-seen order, like a DataFrame built from the rows
+            columns = list(dict.fromkeys(key for row in data for key in row))
+            header = "| " + " | ".join(map(_markdown_cell, columns)) + " |\n"
+            separator = "|" + "|".join(["---"] * len(columns)) + "|\n"
+            body = "".join(
+                "| " + " | ".join(_markdown_cell(row.get(col, "")) for col in columns) + " |\n"
+                for row in data
+            )
+            return (header + separator + body).rstrip("\n")
         except Exception:
-            return json.dumps(data, indent=2)
+            return _to_json(data)
     
     def get_conversation_id(self, session_id: str) -> Optional[str]:
         """Get the Genie conversation ID for a chat session."""
@@ -290,9 +353,9 @@ class GenieMCPClient:
     
     def clear_conversation(self, session_id: str) -> None:
         """Clear the Genie conversation ID for a chat session."""
-        if session_id in self.conversation_ids:
-            del self.conversation_ids[session_id]
+        self.conversation_ids.pop(session_id, None)
     
     async def close(self) -> None:
-        """Close the HTTP client."""
-        await self.client.aclose()
+        """Close an injected HTTP client; the shared client is closed at app shutdown."""
+        if self._own_client is not None:
+            await self._own_client.aclose()
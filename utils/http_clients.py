@@ -0,0 +1,43 @@
+import httpx
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Genie queries can run for minutes, but connecting should fail fast
+GENIE_TIMEOUT = httpx.Timeout(120.0, connect=5.0)
+# HTTP/2 multiplexes concurrent requests over a single connection,
+# so only a handful of idle connections need to be kept alive
+GENIE_LIMITS = httpx.Limits(
+    max_connections=1000,
+    max_keepalive_connections=20,
+    keepalive_expiry=30
+)
+
+_genie_client: Optional[httpx.AsyncClient] = None
+
+
+def get_genie_client() -> httpx.AsyncClient:
+    """
+    Get the app-lifetime HTTP client used for Genie MCP requests.
+    
+    The client is created on first use and shared by every caller so
+    connections (and their TLS sessions) are pooled across requests.
+    """
+    global _genie_client
+    if _genie_client is None or _genie_client.is_closed:
+        _genie_client = httpx.AsyncClient(
+            timeout=GENIE_TIMEOUT,
+            limits=GENIE_LIMITS,
+            http2=True
+        )
+    return _genie_client
+
+
+async def close_genie_client() -> None:
+    """Close the shared Genie HTTP client if it was created."""
+    global _genie_client
+    if _genie_client is not None and not _genie_client.is_closed:
+        await _genie_client.aclose()
+        logger.info("Closed shared Genie HTTP client")
+    _genie_client = None
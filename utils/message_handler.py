@@ -4,7 +4,7 @@ from typing import Dict, Optional
 from models import MessageResponse
 from chat_database import ChatDatabase
 from .chat_history_cache import ChatHistoryCache
-from .config import SERVING_ENDPOINT_NAME
+from .config import settings
 
 
 class MessageHandler:
@@ -21,7 +21,7 @@ class MessageHandler:
             message_id=message_id,
             content=content,
             role=role,
-            model=SERVING_ENDPOINT_NAME,
+            model=settings.serving_endpoint_name,
             timestamp=datetime.now().isoformat(),
             sources=sources,
             metrics=metrics,
@@ -48,7 +48,7 @@ class MessageHandler:
             message_id=message_id,
             content=content,
             role="assistant",
-            model=SERVING_ENDPOINT_NAME,
+            model=settings.serving_endpoint_name,
             timestamp=timestamp.isoformat() if isinstance(timestamp, datetime) else timestamp,
             sources=sources,
             metrics=metrics
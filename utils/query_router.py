@@ -1,11 +1,15 @@
 import re
 import logging
-from typing import Tuple
+from functools import lru_cache
+from typing import Dict, List, Set, Tuple
 from enum import Enum
 
 logger = logging.getLogger(__name__)
 
 
+CLASSIFY_CACHE_SIZE = 4096
+
+
 class QueryType(Enum):
     """Types of queries the chatbot can handle."""
     DATA = "data"
@@ -61,6 +65,18 @@ DATA_QUERY_PATTERNS = [
     r"\bassessment[s]?\b",
 ]
 
+# Domain terms that on their own mark a query as a data query
+STRONG_DATA_TERMS = {
+    "housing risk",
+    "mental health",
+    "measureresponse",
+    "longitudinal",
+    "program evaluation",
+    "support need",
+    "risk level",
+}
+STRONG_DATA_CONFIDENCE = 0.9
+
 GENERAL_QUERY_INDICATORS = [
     r"\bexplain\b",
     r"\bwhat is\b.*\b(machine learning|ai|artificial intelligence|programming|coding|concept)\b",
@@ -92,12 +108,82 @@ GENERAL_QUERY_INDICATORS = [
 ]
 
 
+# Patterns of the form \bword\b or \bword[s]?\b are plain literals
+_LITERAL_PATTERN_RE = re.compile(r"^\\b([a-z ]+)(\[s\]\?)?\\b$")
+
+# Maximal runs of word characters, i.e. the text between \b boundaries
+_WORD_RE = re.compile(r"\w+")
+
+
+def _split_patterns(patterns: List[str], prefix: str) -> Tuple[Dict[str, str], List[Tuple[str, str]]]:
+    """
+    Split routing patterns into single-word literals and residual regex rules.
+    
+    Every pattern is keyed by a stable name (prefix + list index) so the
+    word lookup and regex scan can be counted together per pattern.
+    Multi-word literals stay regex rules since they span tokens.
+    
+    Returns:
+        Tuple of (words, residual) where words maps each word (including
+        its plural form where the pattern allows one) to its pattern key and
+        residual is a list of (pattern, key) pairs
+    """
+    words = {}
+    residual = []
+    for i, pattern in enumerate(patterns):
+        key = f"{prefix}{i}"
+        match = _LITERAL_PATTERN_RE.match(pattern)
+        if match and " " not in match.group(1):
+            word = match.group(1)
+            words[word] = key
+            if match.group(2):
+                words[word + "s"] = key
+        else:
+            residual.append((pattern, key))
+    return words, residual
+
+
+def _compile_alternation(patterns: List[Tuple[str, str]]) -> "re.Pattern[str]":
+    """
+    Compile (pattern, key) pairs into a single alternation regex.
+    
+    Each pattern is wrapped in a zero-width lookahead with its own named
+    group, so a single finditer pass reports every pattern that matches
+    (via match.lastgroup) without one match consuming the text of another.
+    """
+    alternation = "|".join(f"(?=(?P<{key}>{pattern}))" for pattern, key in patterns)
+    return re.compile(alternation, re.IGNORECASE)
+
+
+def _strong_data_keys() -> Set[str]:
+    """Get the pattern keys of the literal patterns listed in STRONG_DATA_TERMS."""
+    keys = set()
+    for i, pattern in enumerate(DATA_QUERY_PATTERNS):
+        match = _LITERAL_PATTERN_RE.match(pattern)
+        if match and match.group(1) in STRONG_DATA_TERMS:
+            keys.add(f"d{i}")
+    return keys
+
+
 class QueryRouter:
     """Routes queries to appropriate service based on content analysis."""
     
     def __init__(self):
-        self.data_patterns = [re.compile(p, re.IGNORECASE) for p in DATA_QUERY_PATTERNS]
-        self.general_patterns = [re.compile(p, re.IGNORECASE) for p in GENERAL_QUERY_INDICATORS]
+        self.data_words, data_residual = _split_patterns(DATA_QUERY_PATTERNS, "d")
+        self.general_words, general_residual = _split_patterns(GENERAL_QUERY_INDICATORS, "g")
+        
+        self.strong_data_keys = _strong_data_keys()
+        self.strong_data_re = _compile_alternation(
+            [(p, k) for p, k in data_residual if k in self.strong_data_keys]
+        )
+        self.data_re = _compile_alternation(
+            [(p, k) for p, k in data_residual if k not in self.strong_data_keys]
+        )
+        self.general_re = _compile_alternation(general_residual)
+        
+        # Classification is pure in the normalized query text, so repeated
+        # queries (and repeated calls within one request) hit the cache
+        self._classify_cached = lru_cache(maxsize=CLASSIFY_CACHE_SIZE)(self._classify_normalized)
     
     def classify_query(self, query: str) -> Tuple[QueryType, float]:
         """
@@ -110,13 +196,29 @@ class QueryRouter:
             Tuple of (QueryType, confidence_score)
             confidence_score ranges from 0.0 to 1.0
         """
-        query_lower = query.lower().strip()
+        return self._classify_cached(query.lower().strip())
+    
+    def _classify_normalized(self, query_lower: str) -> Tuple[QueryType, float]:
+        """Classify an already lowercased and stripped query."""
+        tokens = set(_WORD_RE.findall(query_lower))
+        data_hits = {self.data_words[t] for t in tokens & self.data_words.keys()}
+        general_hits = {self.general_words[t] for t in tokens & self.general_words.keys()}
+        general_hits.update(m.lastgroup for m in self.general_re.finditer(query_lower))
+        
+        # A strong domain term with no general indicator is a data query;
+        # skip the remaining data pattern rules
+        if not general_hits:
+            if not data_hits.isdisjoint(self.strong_data_keys) or self.strong_data_re.search(query_lower):
+                return QueryType.DATA, STRONG_DATA_CONFIDENCE
+        
+        data_hits.update(m.lastgroup for m in self.strong_data_re.finditer(query_lower))
+        data_hits.update(m.lastgroup for m in self.data_re.finditer(query_lower))
         
-        data_matches = sum(1 for p in self.data_patterns if p.search(query_lower))
-        general_matches = sum(1 for p in self.general_patterns if p.search(query_lower))
+        data_matches = len(data_hits)
+        general_matches = len(general_hits)
         
-        total_data_patterns = len(self.data_patterns)
-        total_general_patterns = len(self.general_patterns)
+        total_data_patterns = len(DATA_QUERY_PATTERNS)
+        total_general_patterns = len(GENERAL_QUERY_INDICATORS)
         
         data_score = data_matches / total_data_patterns if total_data_patterns > 0 else 0
         general_score = general_matches / total_general_patterns if total_general_patterns > 0 else 0
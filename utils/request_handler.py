@@ -8,7 +8,7 @@ import time
 from typing import Dict, Optional, Tuple, List, Any
 from datetime import datetime
 from .config import (
-    DATABRICKS_HOST,
+    settings,
     API_TIMEOUT,
     STREAMING_TIMEOUT,
     MAX_CONCURRENT_STREAMS,
@@ -20,7 +20,7 @@ logger = logging.getLogger(__name__)
 
 class RequestHandler:
     def __init__(self, endpoint_name: str):
-        self.host = DATABRICKS_HOST
+        self.host = settings.databricks_host
         self.endpoint_name = endpoint_name
         self.request_queue = asyncio.Queue(maxsize=MAX_QUEUE_SIZE)
         self.streaming_semaphore = asyncio.Semaphore(MAX_CONCURRENT_STREAMS)
@@ -10,7 +10,7 @@ import logging
 import uuid
 from utils.request_handler import RequestHandler
 from datetime import datetime
-from utils.config import SERVING_ENDPOINT_NAME
+from utils.config import settings
 logger = logging.getLogger(__name__)
 class StreamingHandler:
 
@@ -109,7 +109,7 @@ class StreamingHandler:
                                     sources=sources,
                                     metrics={'timeToFirstToken': ttft, 'totalTime': time.time() - start_time}
                                 )
-                streaming_support_cache['endpoints'][SERVING_ENDPOINT_NAME] = {
+                streaming_support_cache['endpoints'][settings.serving_endpoint_name] = {
                     'supports_streaming': True,
                     'supports_trace': supports_trace,
                     'last_checked': datetime.now()